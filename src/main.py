@@ -9,22 +9,27 @@ from __future__ import annotations
 import io
 import json
 import re
+import string
 import unicodedata
-from copy import deepcopy
-from dataclasses import asdict, dataclass
+from concurrent.futures import ThreadPoolExecutor
+from copy import copy
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Callable
+from functools import lru_cache, partial
+from html import unescape
+from typing import Any, Callable, Iterator
 from urllib.parse import parse_qs, quote_plus, urlparse
-from xml.etree import ElementTree as ET
 
-import pandas as pd
+import orjson
 import requests
 import streamlit as st
 from bs4 import BeautifulSoup, Tag
-from openpyxl.cell.cell import MergedCell
-from openpyxl import Workbook, load_workbook
-from openpyxl.drawing.image import Image as XLImage
-from openpyxl.styles import Font, PatternFill
+from lxml import etree
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# pandas, openpyxl and xlsxwriter are imported inside the functions that use them: they are only needed once
+# the user generates or downloads a file, and importing them up front adds ~0.4s to cold start.
 
 
 # Web request configuration
@@ -36,10 +41,33 @@ HEADERS = {
 }
 TIMEOUT_S = 18  # Timeout for general requests
 SEARCH_TIMEOUT_S = 6  # Timeout for search requests
+STREAM_CHUNK_BYTES = 64 * 1024  # Read size for streamed downloads
+MAX_LISTING_BYTES = 4_000_000  # Listing pages are truncated beyond this size
+MAX_PHOTO_BYTES = 5_000_000  # Larger property photos are skipped
+POOL_CONNECTIONS = 10  # Number of per-host connection pools kept by the session
+POOL_MAXSIZE = 20  # Maximum kept-alive connections per host
+RETRY_TOTAL = 2  # Retries for transient 5xx responses and connection errors
+RETRY_BACKOFF_S = 0.3  # Backoff factor between retries
+RETRY_STATUSES = (500, 502, 504)  # 503 is left out: search engines and anti-bot walls use it for throttling
+
+# HTML parsing configuration
+HTML_PARSER = "lxml"  # C-backed tree builder, several times faster than "html.parser"
+
+# Search result link selectors, evaluated with lxml XPath (class tests match CSS class tokens)
+DDG_RESULT_HREFS_XPATH = "//a[contains(concat(' ', normalize-space(@class), ' '), ' result__a ')]/@href"
+BING_RESULT_HREFS_XPATHS = (
+    "//li[contains(concat(' ', normalize-space(@class), ' '), ' b_algo ')]//h2//a/@href",
+    "//main//a/@href",
+)
 
 # Search configuration
 MAX_CANDIDATES = 20  # Maximum number of candidate URLs to collect
 MAX_SEARCH_QUERIES = 5  # Maximum number of search queries to execute
+LISTING_FETCH_WORKERS = 4  # Concurrent listing fetches while checking candidates
+LISTING_CACHE_TTL_S = 3600  # How long fetched listing pages are reused across reruns
+LISTING_CACHE_MAX_ENTRIES = 32  # Cached listing pages kept server-wide (each up to MAX_LISTING_BYTES)
+SEARCH_CACHE_TTL_S = 900  # How long successful search result pages are reused across reruns
+SEARCH_CACHE_MAX_ENTRIES = 256  # Cached search result pages kept server-wide
 SEARCH_PROVIDERS = ("bing_rss", "duckduckgo_html", "duckduckgo_lite")
 
 # Domain hints for scoring URLs
@@ -75,6 +103,75 @@ NOISE_DOMAIN_HINTS = (
     "chip.de",
 )
 
+# Each hint list folded into one alternation so a URL is scored with a single scan per part.
+REAL_ESTATE_HOST_RE = re.compile("|".join(map(re.escape, REAL_ESTATE_DOMAIN_HINTS)))
+NOISE_HOST_RE = re.compile("|".join(map(re.escape, NOISE_DOMAIN_HINTS)))
+LISTING_PATH_RE = re.compile(r"listing|property|home|real-?estate")
+
+FLOAT_RE = re.compile(r"-?[\d,.]+")  # First number-like token in a value
+KEY_CHARS = frozenset(string.ascii_lowercase + string.digits)
+# ASCII characters dropped when normalizing template keys (everything but a-z and 0-9)
+NON_KEY_CHARS_TABLE = str.maketrans("", "", "".join(c for c in map(chr, range(128)) if c not in KEY_CHARS))
+# JSON-LD script bodies (group 1). Comments and other scripts are matched too, only so that their
+# contents are consumed and never scanned: commented-out JSON-LD is not part of the page.
+JSON_LD_RE = re.compile(
+    r"""<!--.*?-->"""
+    r"""|<script\b[^>]*?(?<![\w-])type\s*=\s*["']?application/ld\+json["']?[^>]*>(.*?)</script\s*>"""
+    r"""|<script\b[^>]*>.*?</script\s*>""",
+    re.IGNORECASE | re.DOTALL,
+)
+# JSON-LD @type values describing the listed home ("singlefamilyresidence" is covered by "residence")
+RESIDENCE_TYPE_RE = re.compile(r"residence|house")
+# Template placeholders ({{key}}, [[key]], <key>) in lower-cased, space-free cell text. Keys are
+# _norm_key output, and no two placeholders can overlap, so one finditer pass sees all of them.
+PLACEHOLDER_RE = re.compile(r"\{\{([a-z0-9]+)\}\}|\[\[([a-z0-9]+)\]\]|<([a-z0-9]+)>")
+# Document title (group 1); comments and scripts are consumed so a "<title>" inside them is skipped.
+TITLE_RE = re.compile(
+    r"<!--.*?-->|<script\b[^>]*>.*?</script\s*>|<title\b[^>]*>(.*?)</title\s*>",
+    re.IGNORECASE | re.DOTALL,
+)
+HEAD_END_RE = re.compile(r"</head\s*>", re.IGNORECASE)
+
+# Plain-text fallbacks for listing fields, keyed by PropertyRecord attribute. Every pattern is
+# wrapped in a lookahead so one combined scan finds each field's first match without one
+# field's match consuming the text of another.
+TEXT_FIELD_PATTERNS = {
+    "price": r"\$\s?(?P<price>[\d,]+)",
+    "bedrooms": r"(?P<bedrooms>\d+(?:\.\d+)?)\s*(?:bed|beds|bedroom)",
+    "bathrooms": r"(?P<bathrooms>\d+(?:\.\d+)?)\s*(?:bath|baths|bathroom)",
+    "living_area_sqft": r"(?P<living_area_sqft>[\d,]+)\s*(?:sq\.?\s?ft|square feet)",
+}
+TEXT_FIELDS_RE = re.compile(
+    "|".join(f"(?=(?:{pattern}))" for pattern in TEXT_FIELD_PATTERNS.values()),
+    re.IGNORECASE,
+)
+
+
+def _build_session() -> requests.Session:
+    """Build the shared HTTP session used for all outbound requests.
+
+    Returns:
+        A requests Session with pooled keep-alive adapters, transient-error retries and default headers
+    """
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    retry = Retry(
+        total=RETRY_TOTAL,
+        read=False,  # Re-raise read timeouts as-is, so TIMEOUT_S / SEARCH_TIMEOUT_S stay real upper bounds.
+        backoff_factor=RETRY_BACKOFF_S,
+        status_forcelist=RETRY_STATUSES,
+        respect_retry_after_header=False,  # A server-chosen Retry-After could stall a worker for hours.
+        raise_on_status=False,  # Hand back the last response so callers still see the status code.
+    )
+    adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+# Reusing one session lets repeated calls to the same search/listing host skip the TCP + TLS handshake.
+SESSION = _build_session()
+
 
 @dataclass
 class PropertyRecord:
@@ -124,6 +221,15 @@ class SearchAttempt:
     detail: str | None = None  # Additional details about the search attempt
 
 
+class _SearchPageError(Exception):
+    """Raised for blocked or non-200 search responses so they are never cached."""
+
+    def __init__(self, status_code: int, outcome: str) -> None:
+        super().__init__(f"{outcome} ({status_code})")
+        self.status_code = status_code
+        self.outcome = outcome
+
+
 def _to_float(value: Any) -> float | None:
     """Convert a value to float, handling various input types.
     
@@ -138,7 +244,10 @@ def _to_float(value: Any) -> float | None:
     if isinstance(value, (int, float)):
         return float(value)
     text = str(value)
-    match = re.search(r"-?[\d,.]+", text)
+    # Plain numeric strings (the usual JSON-LD case) convert directly without the regex.
+    if text.isascii() and text.replace(".", "", 1).isdigit():
+        return float(text)
+    match = FLOAT_RE.search(text)
     if not match:
         return None
     try:
@@ -215,12 +324,24 @@ def _build_search_queries(mls_number: str, state: str) -> list[str]:
         f'"{mls_number}" site:redfin.com',
     ]
     # Keep order stable and remove blanks/duplicates.
-    out: list[str] = []
-    for q in base_terms:
-        normalized = " ".join(q.split()).strip()
-        if normalized and normalized not in out:
-            out.append(normalized)
-    return out
+    return list(dict.fromkeys(normalized for q in base_terms if (normalized := " ".join(q.split()))))
+
+
+@lru_cache(maxsize=256)
+def _mls_patterns(mls_number: str) -> tuple[re.Pattern[str], ...]:
+    """Compile the MLS-number match patterns once per MLS number.
+
+    Args:
+        mls_number: The stripped MLS number to build patterns for
+
+    Returns:
+        A tuple of compiled patterns, most specific first
+    """
+    mls_escaped = re.escape(mls_number)
+    return (
+        re.compile(rf"\bMLS\s*(?:#|ID|Number|No\.?)?\s*[:#]?\s*{mls_escaped}\b", re.IGNORECASE),
+        re.compile(rf"\b{mls_escaped}\b", re.IGNORECASE),
+    )
 
 
 def _has_mls_match(page_html: str, page_text: str, url: str, mls_number: str) -> bool:
@@ -235,19 +356,20 @@ def _has_mls_match(page_html: str, page_text: str, url: str, mls_number: str) ->
     Returns:
         True if the page contains a match for the MLS number, False otherwise
     """
-    mls_escaped = re.escape(mls_number.strip())
-    patterns = [
-        rf"\bMLS\s*(?:#|ID|Number|No\.?)?\s*[:#]?\s*{mls_escaped}\b",
-        rf"\b{mls_escaped}\b",
-    ]
-    for pattern in patterns:
-        if re.search(pattern, page_text, re.IGNORECASE):
-            return True
-        if re.search(pattern, page_html, re.IGNORECASE):
+    needle = mls_number.strip()
+    patterns = _mls_patterns(needle)
+    # Every pattern contains the MLS number verbatim, so when case folding cannot change it
+    # (e.g. all digits) a plain substring scan rules a page out before any regex runs.
+    case_free = needle.lower() == needle.upper()
+    for page in (page_text, page_html):
+        if case_free and needle not in page:
+            continue
+        if any(pattern.search(page) for pattern in patterns):
             return True
     return mls_number in url
 
 
+@lru_cache(maxsize=4096)
 def _candidate_url_score(url: str) -> int:
     """Score a URL based on its likelihood of containing real estate listings.
     
@@ -261,17 +383,47 @@ def _candidate_url_score(url: str) -> int:
     host = parsed.netloc.lower()
     path = parsed.path.lower()
     score = 0
-    if any(hint in host for hint in REAL_ESTATE_DOMAIN_HINTS):
+    if REAL_ESTATE_HOST_RE.search(host):
         score += 10
-    if any(hint in host for hint in NOISE_DOMAIN_HINTS):
+    if NOISE_HOST_RE.search(host):
         score -= 10
-    if any(term in path for term in ("listing", "property", "home", "real-estate", "realestate")):
+    if LISTING_PATH_RE.search(path):
         score += 2
-    if any(token in url.lower() for token in ("mls", "smartmls")):
+    if "mls" in url.lower():  # Also covers "smartmls".
         score += 3
     return score
 
 
+def _parse_html_root(html: str) -> Any:
+    """Parse HTML into a raw lxml tree, skipping BeautifulSoup's tree wrapping.
+
+    Link harvesting only needs attribute values, which XPath returns straight from C.
+
+    Args:
+        html: HTML content to parse
+
+    Returns:
+        The root element, or None if the document is empty
+    """
+    # Fix the encoding so lxml does not second-guess it from a <meta charset> in the page.
+    return etree.fromstring(html.encode("utf-8"), etree.HTMLParser(encoding="utf-8"))
+
+
+def _html_hrefs(root: Any, expression: str) -> list[str]:
+    """Evaluate an href-selecting XPath expression on a raw lxml HTML tree.
+
+    Args:
+        root: Root element from _parse_html_root, or None for an empty document
+        expression: XPath expression selecting href attribute values
+
+    Returns:
+        The matched values as plain strings
+    """
+    if root is None:
+        return []
+    return root.xpath(expression, smart_strings=False)
+
+
 def _parse_duckduckgo_html_links(html: str) -> list[str]:
     """Parse links from DuckDuckGo HTML search results.
     
@@ -281,11 +433,12 @@ def _parse_duckduckgo_html_links(html: str) -> list[str]:
     Returns:
         A list of URLs extracted from the search results
     """
-    soup = BeautifulSoup(html, "html.parser")
     links: list[str] = []
-    for a in soup.select("a.result__a"):
-        href = _decode_search_result_href(a.get("href"))
-        if href and href not in links:
+    seen: set[str] = set()
+    for raw_href in _html_hrefs(_parse_html_root(html), DDG_RESULT_HREFS_XPATH):
+        href = _decode_search_result_href(raw_href)
+        if href and href not in seen:
+            seen.add(href)
             links.append(href)
     return links
 
@@ -299,15 +452,16 @@ def _parse_duckduckgo_lite_links(html: str) -> list[str]:
     Returns:
         A list of URLs extracted from the search results
     """
-    soup = BeautifulSoup(html, "html.parser")
     links: list[str] = []
-    for a in soup.select("a"):
-        href = _decode_search_result_href(a.get("href"))
+    seen: set[str] = set()
+    for raw_href in _html_hrefs(_parse_html_root(html), "//a/@href"):
+        href = _decode_search_result_href(raw_href)
         if not href:
             continue
         if "duckduckgo.com" in urlparse(href).netloc.lower():
             continue
-        if href not in links:
+        if href not in seen:
+            seen.add(href)
             links.append(href)
     return links
 
@@ -321,17 +475,18 @@ def _parse_bing_html_links(html: str) -> list[str]:
     Returns:
         A list of URLs extracted from the search results
     """
-    soup = BeautifulSoup(html, "html.parser")
+    root = _parse_html_root(html)
     links: list[str] = []
-    for selector in ("li.b_algo h2 a", "main a"):
-        for a in soup.select(selector):
-            href = a.get("href")
-            if not href or not href.startswith("http"):
+    seen: set[str] = set()
+    for expression in BING_RESULT_HREFS_XPATHS:
+        for href in _html_hrefs(root, expression):
+            if not href.startswith("http"):
                 continue
             host = urlparse(href).netloc.lower()
             if "bing.com" in host or "microsoft.com" in host:
                 continue
-            if href not in links:
+            if href not in seen:
+                seen.add(href)
                 links.append(href)
         if links:
             break
@@ -348,9 +503,13 @@ def _parse_bing_rss_links(xml_text: str) -> list[str]:
         A list of URLs extracted from the RSS feed
     """
     links: list[str] = []
+    seen: set[str] = set()
     try:
-        root = ET.fromstring(xml_text)
-    except ET.ParseError:
+        # lxml rejects str input that carries an XML encoding declaration, so hand it bytes.
+        # The feed is untrusted network XML: never expand entities or fetch external DTDs.
+        parser = etree.XMLParser(resolve_entities=False, no_network=True)
+        root = etree.fromstring(xml_text.encode("utf-8"), parser)
+    except (etree.XMLSyntaxError, ValueError):
         return links
 
     for item in root.findall("./channel/item"):
@@ -358,11 +517,35 @@ def _parse_bing_rss_links(xml_text: str) -> list[str]:
         if link_node is None or not link_node.text:
             continue
         href = link_node.text.strip()
-        if href.startswith("http") and href not in links:
+        if href.startswith("http") and href not in seen:
+            seen.add(href)
             links.append(href)
     return links
 
 
+@st.cache_data(ttl=SEARCH_CACHE_TTL_S, max_entries=SEARCH_CACHE_MAX_ENTRIES, show_spinner=False)
+def _fetch_search_page(url: str) -> str:
+    """Fetch a search results page, memoized by URL so reruns of the same query skip the network.
+
+    Blocked and failed responses raise and are therefore never cached.
+
+    Args:
+        url: The search results URL to fetch
+
+    Returns:
+        The body of the search results page
+
+    Raises:
+        _SearchPageError: If the provider blocked the request or did not answer with 200
+    """
+    response = SESSION.get(url, timeout=SEARCH_TIMEOUT_S)
+    if _is_blocked_search_response(response.status_code, response.text):
+        raise _SearchPageError(response.status_code, "blocked")
+    if response.status_code != 200:
+        raise _SearchPageError(response.status_code, "http_error")
+    return response.text
+
+
 def _fetch_search_results(query_text: str, provider: str) -> tuple[list[str], SearchAttempt]:
     """Fetch search results from a specific provider.
     
@@ -390,20 +573,17 @@ def _fetch_search_results(query_text: str, provider: str) -> tuple[list[str], Se
         return [], SearchAttempt(provider, query_text, None, "error", detail="unknown provider")
 
     try:
-        response = requests.get(url, headers=HEADERS, timeout=SEARCH_TIMEOUT_S)
+        page = _fetch_search_page(url)
+    except _SearchPageError as exc:
+        return [], SearchAttempt(provider, query_text, exc.status_code, exc.outcome)
     except requests.RequestException as exc:
         return [], SearchAttempt(provider, query_text, None, "network_error", detail=str(exc))
 
-    if _is_blocked_search_response(response.status_code, response.text):
-        return [], SearchAttempt(provider, query_text, response.status_code, "blocked")
-    if response.status_code != 200:
-        return [], SearchAttempt(provider, query_text, response.status_code, "http_error")
-
-    links = parser(response.text)
+    links = parser(page)
     return links, SearchAttempt(
         provider,
         query_text,
-        response.status_code,
+        200,
         "ok" if links else "no_results",
         hits=len(links),
     )
@@ -425,34 +605,42 @@ def discover_listing_candidates(
         A tuple containing a list of candidate URLs and a list of search attempts
     """
     links: list[str] = []
+    seen_links: set[str] = set()
     attempts: list[SearchAttempt] = []
     blocked_providers: set[str] = set()
-    for query_text in _build_search_queries(mls_number, state)[:MAX_SEARCH_QUERIES]:
-        for provider in SEARCH_PROVIDERS:
-            if provider in blocked_providers:
-                continue
-            provider_links, attempt = _fetch_search_results(query_text, provider)
-            attempts.append(attempt)
-            if reporter is not None:
-                reporter(
-                    f"search {provider} | query={query_text} | outcome={attempt.outcome} "
-                    f"| status={attempt.status_code} | hits={attempt.hits}"
+    # Each query fans out to its providers concurrently (one request per search host at a time);
+    # results are consumed in provider order so ranking and blocking behave as if run serially.
+    with ThreadPoolExecutor(max_workers=len(SEARCH_PROVIDERS)) as executor:
+        for query_text in _build_search_queries(mls_number, state)[:MAX_SEARCH_QUERIES]:
+            providers = [p for p in SEARCH_PROVIDERS if p not in blocked_providers]
+            results = executor.map(partial(_fetch_search_results, query_text), providers)
+            for provider, (provider_links, attempt) in zip(providers, results):
+                attempts.append(attempt)
+                if reporter is not None:
+                    reporter(
+                        f"search {provider} | query={query_text} | outcome={attempt.outcome} "
+                        f"| status={attempt.status_code} | hits={attempt.hits}"
+                    )
+                if attempt.outcome == "blocked":
+                    blocked_providers.add(provider)
+                # Score each link once; sort is stable so equal scores keep provider order.
+                ranked_links = sorted(
+                    ((_candidate_url_score(href), href) for href in provider_links),
+                    key=lambda scored: scored[0],
+                    reverse=True,
                 )
-            if attempt.outcome == "blocked":
-                blocked_providers.add(provider)
-            ranked_links = sorted(provider_links, key=_candidate_url_score, reverse=True)
-            for href in ranked_links:
-                score = _candidate_url_score(href)
-                if provider == "bing_rss" and score <= 0:
-                    continue
-                if score < 0:
-                    continue
-                if href not in links:
-                    links.append(href)
-                    if reporter is not None:
-                        reporter(f"candidate + score={score} | {href}")
-                if len(links) >= MAX_CANDIDATES:
-                    return links, attempts
+                for score, href in ranked_links:
+                    if provider == "bing_rss" and score <= 0:
+                        continue
+                    if score < 0:
+                        continue
+                    if href not in seen_links:
+                        seen_links.add(href)
+                        links.append(href)
+                        if reporter is not None:
+                            reporter(f"candidate + score={score} | {href}")
+                    if len(links) >= MAX_CANDIDATES:
+                        return links, attempts
     return links, attempts
 
 
@@ -466,7 +654,7 @@ def diagnose_url_access(url: str) -> str | None:
         A string describing the access issue, or None if no issues found
     """
     try:
-        response = requests.get(url, headers=HEADERS, timeout=SEARCH_TIMEOUT_S)
+        response = SESSION.get(url, timeout=SEARCH_TIMEOUT_S)
     except requests.RequestException as exc:
         return f"Could not fetch the manual URL ({type(exc).__name__})."
 
@@ -497,30 +685,35 @@ def search_listing_candidates(mls_number: str, state: str) -> list[str]:
     return links
 
 
-def _extract_json_ld(soup: BeautifulSoup) -> list[dict[str, Any]]:
-    """Extract JSON-LD structured data from the HTML soup.
+def _extract_json_ld(html_content: str) -> list[dict[str, Any]]:
+    """Extract JSON-LD structured data straight from the raw HTML.
+
+    Script bodies are raw text, so a regex finds them without building a DOM.
     
     Args:
-        soup: BeautifulSoup object representing the HTML content
+        html_content: The HTML content to scan
         
     Returns:
         A list of dictionaries containing the extracted JSON-LD data
     """
     docs: list[dict[str, Any]] = []
-    for node in soup.find_all("script", {"type": "application/ld+json"}):
-        if not isinstance(node, Tag):
-            continue
-        raw = ((node.string if node.string is not None else node.get_text()) or "").strip()
+    for match in JSON_LD_RE.finditer(html_content):
+        raw = (match.group(1) or "").strip()
         if not raw:
             continue
         try:
-            parsed = json.loads(raw)
-            if isinstance(parsed, list):
-                docs.extend([x for x in parsed if isinstance(x, dict)])
-            elif isinstance(parsed, dict):
-                docs.append(parsed)
-        except json.JSONDecodeError:
-            continue
+            parsed = orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            # orjson rejects NaN/Infinity and lone surrogate escapes (e.g. a description cut
+            # mid-emoji) that the stdlib parser accepts, so retry with json before skipping.
+            try:
+                parsed = json.loads(raw)
+            except ValueError:
+                continue
+        if isinstance(parsed, list):
+            docs.extend([x for x in parsed if isinstance(x, dict)])
+        elif isinstance(parsed, dict):
+            docs.append(parsed)
     return docs
 
 
@@ -548,6 +741,43 @@ def _first_image_url(value: Any) -> str | None:
     return None
 
 
+def _scan_text_fields(text: str, fields: list[str]) -> dict[str, float | None]:
+    """Find the first text match for each requested field in a single pass.
+
+    Args:
+        text: The page text to scan
+        fields: Names of the TEXT_FIELD_PATTERNS fields to look for
+
+    Returns:
+        A dictionary mapping each requested field to its parsed value (None if not found)
+    """
+    found: dict[str, float | None] = dict.fromkeys(fields)
+    pending = set(fields)
+    for match in TEXT_FIELDS_RE.finditer(text):
+        name = match.lastgroup
+        if name in pending:
+            found[name] = _to_float(match.group(name))
+            pending.discard(name)
+            if not pending:
+                break
+    return found
+
+
+def _head_title(html_content: str) -> str | None:
+    """Read the document title from the raw <head> markup, without a parsed tree.
+
+    Args:
+        html_content: The HTML content to scan
+
+    Returns:
+        The unescaped title truncated to 80 characters, or None if the head has no title
+    """
+    head_end = HEAD_END_RE.search(html_content)
+    head = html_content[: head_end.start()] if head_end else html_content
+    title = next((unescape(m.group(1)).strip() for m in TITLE_RE.finditer(head) if m.group(1) is not None), "")
+    return title[:80] if title else None
+
+
 def _extract_from_html_content(
     url: str,
     html_content: str,
@@ -565,16 +795,12 @@ def _extract_from_html_content(
     Returns:
         A PropertyRecord object with the extracted data, or None if extraction failed
     """
-    soup = BeautifulSoup(html_content, "html.parser")
-    full_text = soup.get_text(" ", strip=True)
-    mls_match = _has_mls_match(html_content, full_text, url, mls_number)
-
     record = PropertyRecord(mls_number=mls_number, state=state, listing_url=url)
-    docs = _extract_json_ld(soup)
+    docs = _extract_json_ld(html_content)
 
     for doc in docs:
         dtype = str(doc.get("@type", "")).lower()
-        if "residence" in dtype or "house" in dtype or "singlefamilyresidence" in dtype:
+        if RESIDENCE_TYPE_RE.search(dtype):
             record.address = (
                 doc.get("name")
                 or (doc.get("address") or {}).get("streetAddress")
@@ -600,18 +826,19 @@ def _extract_from_html_content(
         if record.photo_url is None:
             record.photo_url = _first_image_url(doc.get("image")) or record.photo_url
 
-    if not record.price:
-        m = re.search(r"\$\s?([\d,]+)", full_text)
-        record.price = _to_float(m.group(1)) if m else None
-    if not record.bedrooms:
-        m = re.search(r"(\d+(?:\.\d+)?)\s*(?:bed|beds|bedroom)", full_text, re.IGNORECASE)
-        record.bedrooms = _to_float(m.group(1)) if m else None
-    if not record.bathrooms:
-        m = re.search(r"(\d+(?:\.\d+)?)\s*(?:bath|baths|bathroom)", full_text, re.IGNORECASE)
-        record.bathrooms = _to_float(m.group(1)) if m else None
-    if not record.living_area_sqft:
-        m = re.search(r"([\d,]+)\s*(?:sq\.?\s?ft|square feet)", full_text, re.IGNORECASE)
-        record.living_area_sqft = _to_float(m.group(1)) if m else None
+    missing_fields = [name for name in TEXT_FIELD_PATTERNS if not getattr(record, name)]
+    if not missing_fields and record.photo_url:
+        # JSON-LD already supplied everything the page text and meta tags could add, so skip
+        # building the DOM. A populated price also satisfies the MLS safety check below.
+        record.source_name = _head_title(html_content)
+        return record
+
+    soup = BeautifulSoup(html_content, HTML_PARSER)
+    full_text = soup.get_text(" ", strip=True)
+
+    if missing_fields:
+        for name, value in _scan_text_fields(full_text, missing_fields).items():
+            setattr(record, name, value)
 
     title = soup.title.string.strip() if soup.title and soup.title.string else ""
     record.source_name = title[:80] if title else None
@@ -623,11 +850,56 @@ def _extract_from_html_content(
                 record.photo_url = content
 
     # Keep a safety check, but avoid false negatives from JS-heavy pages that hide MLS in rendered text.
-    if not mls_match and not any([record.address, record.price, record.bedrooms, record.bathrooms]):
+    # The MLS scan only runs when no extracted field already vouches for the page.
+    if not any([record.address, record.price, record.bedrooms, record.bathrooms]) and not _has_mls_match(
+        html_content, full_text, url, mls_number
+    ):
         return None
     return record
 
 
+def _read_capped(response: requests.Response, max_bytes: int) -> tuple[bytes, bool]:
+    """Read a streamed response body, stopping once it exceeds a size cap.
+
+    Args:
+        response: A response opened with ``stream=True``
+        max_bytes: Maximum number of bytes to keep
+
+    Returns:
+        A tuple of the body (at most ``max_bytes`` long) and whether it was truncated
+    """
+    chunks: list[bytes] = []
+    size = 0
+    for chunk in response.iter_content(chunk_size=STREAM_CHUNK_BYTES):
+        chunks.append(chunk)
+        size += len(chunk)
+        if size > max_bytes:
+            return b"".join(chunks)[:max_bytes], True
+    return b"".join(chunks), False
+
+
+@st.cache_data(ttl=LISTING_CACHE_TTL_S, max_entries=LISTING_CACHE_MAX_ENTRIES, show_spinner=False)
+def _fetch_listing_html(url: str) -> str:
+    """Fetch a listing page, memoized by URL so retries and reruns skip the network.
+
+    Failed requests raise and are therefore never cached.
+
+    Args:
+        url: The URL of the listing to fetch
+
+    Returns:
+        The HTML content of the listing page, truncated to MAX_LISTING_BYTES
+    """
+    with SESSION.get(url, timeout=TIMEOUT_S, stream=True) as response:
+        response.raise_for_status()
+        body, _truncated = _read_capped(response, MAX_LISTING_BYTES)
+        encoding = response.encoding or "utf-8"
+    try:
+        return body.decode(encoding, errors="replace")
+    except LookupError:
+        return body.decode("utf-8", errors="replace")
+
+
 def extract_from_listing(url: str, mls_number: str, state: str) -> PropertyRecord | None:
     """Extract property record from a listing URL.
     
@@ -640,11 +912,37 @@ def extract_from_listing(url: str, mls_number: str, state: str) -> PropertyRecor
         A PropertyRecord object with the extracted data, or None if extraction failed
     """
     try:
-        response = requests.get(url, headers=HEADERS, timeout=TIMEOUT_S)
-        response.raise_for_status()
+        html_content = _fetch_listing_html(url)
     except Exception:
         return None
-    return _extract_from_html_content(url, response.text, mls_number, state)
+    return _extract_from_html_content(url, html_content, mls_number, state)
+
+
+def iter_listing_extractions(
+    urls: list[str],
+    mls_number: str,
+    state: str,
+) -> Iterator[tuple[str, PropertyRecord | None]]:
+    """Fetch and parse candidate listings concurrently, yielding results in candidate order.
+
+    Fetches run ahead in a small thread pool so network waits overlap. Pending fetches are
+    cancelled as soon as the caller stops iterating (e.g. after the first match).
+
+    Args:
+        urls: Candidate listing URLs, best first
+        mls_number: The MLS number to look for
+        state: The state where the property is located
+
+    Yields:
+        Tuples of (url, PropertyRecord or None) in the same order as ``urls``
+    """
+    executor = ThreadPoolExecutor(max_workers=LISTING_FETCH_WORKERS)
+    try:
+        futures = [executor.submit(extract_from_listing, url, mls_number, state) for url in urls]
+        for url, future in zip(urls, futures):
+            yield url, future.result()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
 
 
 def extract_from_pasted_content(
@@ -704,43 +1002,25 @@ def render_default_workbook(record: PropertyRecord, metrics: ExecutiveMetrics) -
     Returns:
         Bytes representing the Excel workbook
     """
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Executive File"
-    ws["A1"] = "Professional Executive Property File"
-    ws["A1"].font = Font(size=16, bold=True, color="FFFFFF")
-    ws["A1"].fill = PatternFill("solid", fgColor="1E3A5F")
-
-    rows = [
-        ("Generated At", datetime.utcnow().isoformat(timespec="seconds") + "Z"),
-        ("MLS Number", record.mls_number),
-        ("State", record.state),
-        ("Address", record.address),
-        ("City", record.city),
-        ("ZIP", record.zip_code),
-        ("List Price", record.price),
-        ("Beds", record.bedrooms),
-        ("Baths", record.bathrooms),
-        ("Living Area (sqft)", record.living_area_sqft),
-        ("Lot Size (sqft)", record.lot_size_sqft),
-        ("Property Type", record.property_type),
-        ("Year Built", record.year_built),
-        ("Broker", record.broker_name),
-        ("Source", record.listing_url),
-        ("Price / sqft", metrics.price_per_sqft),
-        ("Estimated NOI", metrics.estimated_noi),
-        ("Estimated Cap Rate", metrics.estimated_cap_rate),
-        ("Recommendation", metrics.recommendation),
-    ]
-    for idx, (k, v) in enumerate(rows, start=3):
-        ws[f"A{idx}"] = k
-        ws[f"A{idx}"].font = Font(bold=True)
-        ws[f"B{idx}"] = v
-    ws.column_dimensions["A"].width = 26
-    ws.column_dimensions["B"].width = 60
+    import xlsxwriter
 
     stream = io.BytesIO()
-    wb.save(stream)
+    # Keep listing URLs as plain strings: xlsxwriter would otherwise turn them into hyperlinks
+    # and drop any longer than Excel's URL limit.
+    wb = xlsxwriter.Workbook(stream, {"in_memory": True, "strings_to_urls": False})
+    ws = wb.add_worksheet("Executive File")
+    ws.set_column("A:A", 26)
+    ws.set_column("B:B", 60)
+
+    title_format = wb.add_format({"bold": True, "font_size": 16, "font_color": "#FFFFFF", "bg_color": "#1E3A5F", "pattern": 1})
+    ws.write(0, 0, "Professional Executive Property File", title_format)
+
+    label_format = wb.add_format({"bold": True})
+    for row, (k, v) in enumerate(_executive_rows(record, metrics), start=2):
+        ws.write(row, 0, k, label_format)
+        ws.write(row, 1, v)
+
+    wb.close()
     return stream.getvalue()
 
 
@@ -785,6 +1065,8 @@ def _write_executive_rows_to_sheet(ws: Any, rows: list[tuple[str, Any]], title:
         rows: The rows to write
         title: The title for the sheet
     """
+    from openpyxl.styles import Font
+
     ws["A1"] = title
     ws["A1"].font = Font(size=14, bold=True)
     for idx, (k, v) in enumerate(rows, start=3):
@@ -806,6 +1088,8 @@ def _is_writable_cell(ws: Any, row: int, col: int) -> bool:
     Returns:
         True if the cell is writable, False otherwise
     """
+    from openpyxl.cell.cell import MergedCell
+
     return not isinstance(ws.cell(row=row, column=col), MergedCell)
 
 
@@ -840,7 +1124,22 @@ def _norm_key(text: str) -> str:
         The normalized text string
     """
     ascii_text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
-    return re.sub(r"[^a-z0-9]", "", ascii_text.lower())
+    return ascii_text.lower().translate(NON_KEY_CHARS_TABLE)
+
+
+@lru_cache(maxsize=256)
+def _norm_alias_key(alias: str) -> str:
+    """Normalize a payload field name or template alias, memoized across workbooks.
+
+    Only the fixed field and alias names go through this cache; uploaded cell text does not.
+
+    Args:
+        alias: The field name or alias to normalize
+
+    Returns:
+        The normalized alias key
+    """
+    return _norm_key(alias)
 
 
 def _download_photo_bytes(photo_url: str | None) -> bytes | None:
@@ -855,14 +1154,20 @@ def _download_photo_bytes(photo_url: str | None) -> bytes | None:
     if not photo_url:
         return None
     try:
-        r = requests.get(photo_url, headers=HEADERS, timeout=TIMEOUT_S)
-        r.raise_for_status()
+        with SESSION.get(photo_url, timeout=TIMEOUT_S, stream=True) as r:
+            r.raise_for_status()
+            content_type = (r.headers.get("Content-Type") or "").lower()
+            if not (content_type.startswith("image/") or photo_url.lower().endswith((".jpg", ".jpeg", ".png", ".webp"))):
+                return None
+            # Reject declared-oversized photos before reading any of the body.
+            content_length = r.headers.get("Content-Length") or ""
+            if content_length.isdigit() and int(content_length) > MAX_PHOTO_BYTES:
+                return None
+            body, truncated = _read_capped(r, MAX_PHOTO_BYTES)
     except requests.RequestException:
         return None
-    content_type = (r.headers.get("Content-Type") or "").lower()
-    if not (content_type.startswith("image/") or photo_url.lower().endswith((".jpg", ".jpeg", ".png", ".webp"))):
-        return None
-    return r.content
+    # A truncated image would be corrupt, so oversized photos are skipped entirely.
+    return None if truncated else body
 
 
 def _replace_template_images(wb: Any, photo_bytes: bytes | None) -> None:
@@ -872,25 +1177,38 @@ def _replace_template_images(wb: Any, photo_bytes: bytes | None) -> None:
         wb: The workbook to modify
         photo_bytes: The new photo bytes to use
     """
+    from openpyxl.drawing.image import Image as XLImage
+
+    # Read the photo header once; every anchor gets a shallow copy of this image.
+    photo_img = None
+    if photo_bytes:
+        try:
+            photo_img = XLImage(io.BytesIO(photo_bytes))
+        except Exception:
+            photo_img = None
+
     for ws in wb.worksheets[:3]:
         existing_images = list(getattr(ws, "_images", []))
         if not existing_images:
             continue
 
+        # The old images are discarded below, so their anchors can be handed over without copying.
         anchors_and_sizes: list[tuple[Any, float, float]] = []
         for img in existing_images:
-            anchors_and_sizes.append((deepcopy(getattr(img, "anchor", None)), float(getattr(img, "width", 0)), float(getattr(img, "height", 0))))
+            anchors_and_sizes.append((getattr(img, "anchor", None), float(getattr(img, "width", 0)), float(getattr(img, "height", 0))))
 
         # Remove old/sample images from the template.
         ws._images = []
 
-        if not photo_bytes:
+        if photo_img is None:
             continue
 
         # Add the fetched property photo at the same anchors/sizes.
         for anchor, width, height in anchors_and_sizes:
             try:
-                new_img = XLImage(io.BytesIO(photo_bytes))
+                new_img = copy(photo_img)
+                # openpyxl closes an image's stream when saving it, so each copy needs its own.
+                new_img.ref = io.BytesIO(photo_bytes)
                 if width:
                     new_img.width = width
                 if height:
@@ -913,9 +1231,11 @@ def apply_to_template(template_bytes: bytes, record: PropertyRecord, metrics: Ex
     Returns:
         The modified Excel file as bytes
     """
+    from openpyxl import load_workbook
+
     wb = load_workbook(io.BytesIO(template_bytes))
     _replace_template_images(wb, _download_photo_bytes(record.photo_url))
-    payload = {**asdict(record), **asdict(metrics), "generated_at": datetime.utcnow().isoformat(timespec="seconds") + "Z"}
+    payload = {**vars(record), **vars(metrics), "generated_at": datetime.utcnow().isoformat(timespec="seconds") + "Z"}
     alias_payload: dict[str, Any] = {}
     alias_groups = {
         "generated_at": ["fechageneracion", "generadoel", "fechadegeneracion"],
@@ -941,13 +1261,16 @@ def apply_to_template(template_bytes: bytes, record: PropertyRecord, metrics: Ex
         "recommendation": ["recommendation", "recomendacion"],
     }
     for key, value in payload.items():
-        key_norm = _norm_key(key)
+        key_norm = _norm_alias_key(key)
         if key_norm:
             alias_payload[key_norm] = value
     for canonical_key, aliases in alias_groups.items():
         if canonical_key in payload:
             for alias in aliases:
-                alias_payload[_norm_key(alias)] = payload[canonical_key]
+                alias_payload[_norm_alias_key(alias)] = payload[canonical_key]
+    alias_rank = {key_norm: rank for rank, key_norm in enumerate(alias_payload)}
+    # Templates repeat labels across cells and sheets; memoize per call so nothing outlives this workbook.
+    normalized_cells: dict[str, str] = {}
 
     # Clear all cells in the target worksheets before populating with new data
     target_sheets = wb.worksheets[:3]
@@ -958,25 +1281,33 @@ def apply_to_template(template_bytes: bytes, record: PropertyRecord, metrics: Ex
                 if not isinstance(cell.value, str):
                     continue
                 raw_text = cell.value
-                normalized = _norm_key(raw_text)
+                normalized = normalized_cells.get(raw_text)
+                if normalized is None:
+                    normalized = normalized_cells[raw_text] = _norm_key(raw_text)
 
-                # Placeholder replacement in the same cell (e.g. {{mls_number}}, [[price]], <city>).
-                compact = _norm_key(raw_text)
-                for key_norm, val in alias_payload.items():
-                    token_candidates = ("{{" + key_norm + "}}", "[[" + key_norm + "]]", "<" + key_norm + ">")
-                    if any(token in raw_text.lower().replace(" ", "") for token in token_candidates):
-                        cell.value = "" if val is None else str(val)
-                        break
                 # If the whole cell is a placeholder-like key, replace the cell itself.
                 if normalized in alias_payload:
                     cell.value = alias_payload[normalized]
                     continue
 
+                # Placeholder replacement in the same cell (e.g. {{mls_number}}, [[price]], <city>).
+                # One regex pass finds every placeholder; the earliest alias in payload order wins.
+                compact = raw_text.lower().replace(" ", "")
+                placeholder_keys = [
+                    key for match in PLACEHOLDER_RE.finditer(compact) if (key := match.group(match.lastindex)) in alias_rank
+                ]
+                if placeholder_keys:
+                    val = alias_payload[min(placeholder_keys, key=alias_rank.__getitem__)]
+                    cell.value = "" if val is None else str(val)
+                    continue
+
                 # Label/value template pattern: write to the next cell when the label references a payload key.
+                # Only the first matching key is tried: whether a nearby cell is writable does not depend on
+                # the key, so a failed write would fail again for every later match.
                 for key_norm, val in alias_payload.items():
                     if key_norm and key_norm in normalized:
-                        if _safe_write_nearby(ws, cell.row, cell.column + 1, val):
-                            break
+                        _safe_write_nearby(ws, cell.row, cell.column + 1, val)
+                        break
 
     out = io.BytesIO()
     wb.save(out)
@@ -1030,6 +1361,8 @@ def build_ui() -> None:
     template_file = st.file_uploader("Upload Excel Template (optional)", type=["xlsx"])
 
     if st.button("Generate Executive File", type="primary"):
+        import pandas as pd
+
         if not mls_number.strip():
             st.error("MLS number is required.")
             return
@@ -1083,12 +1416,13 @@ def build_ui() -> None:
                     _debug("no candidate URLs found")
 
                 total_candidates = max(len(candidates), 1)
-                for idx, url in enumerate(candidates, start=1):
-                    live_status.info(f"Checking candidate {idx}/{len(candidates)}")
+                if candidates:
+                    _debug(f"parse start | candidates={len(candidates)} | workers={LISTING_FETCH_WORKERS}")
+                extractions = iter_listing_extractions(candidates, mls_number.strip(), state)
+                for idx, (url, record) in enumerate(extractions, start=1):
+                    live_status.info(f"Checked candidate {idx}/{len(candidates)}")
                     parse_pct = 10 + int(85 * idx / total_candidates)
-                    live_progress.progress(parse_pct, text=f"Parsing candidate {idx}/{len(candidates)}")
-                    _debug(f"parse start | {url}")
-                    record = extract_from_listing(url, mls_number.strip(), state)
+                    live_progress.progress(parse_pct, text=f"Parsed candidate {idx}/{len(candidates)}")
                     if record is None:
                         _debug(f"parse no-match/unreadable | {url}")
                         continue
@@ -1098,6 +1432,7 @@ def build_ui() -> None:
                         f"url={url} | price={record.price} | beds={record.bedrooms} | baths={record.bathrooms}"
                     )
                     break
+                extractions.close()
             live_progress.progress(100, text="Done")
             live_status.success("Workflow completed.")
 
@@ -1107,7 +1442,7 @@ def build_ui() -> None:
             elif browser_mode and pasted_page_content.strip():
                 st.info("Browser-assisted mode provided pasted page content, so web search/fetch was skipped.")
             elif search_attempts:
-                st.dataframe(pd.DataFrame([asdict(a) for a in search_attempts]), use_container_width=True)
+                st.dataframe(pd.DataFrame([vars(a) for a in search_attempts]), use_container_width=True)
                 blocked_count = sum(1 for a in search_attempts if a.outcome == "blocked")
                 if blocked_count:
                     st.warning(
@@ -1151,18 +1486,25 @@ def build_ui() -> None:
         metrics = calculate_metrics(record)
 
         st.success(f"Found source: {record.listing_url}")
-        st.dataframe(pd.DataFrame([asdict(record) | asdict(metrics)]), use_container_width=True)
+        st.dataframe(pd.DataFrame([vars(record) | vars(metrics)]), use_container_width=True)
 
+        # Templates are filled right away so a bad upload is reported here, and the photo is
+        # downloaded once; the default workbook is only built when the user clicks download.
+        workbook_data: bytes | Callable[[], bytes]
         if template_file is not None:
-            result = apply_to_template(template_file.read(), record, metrics)
+            try:
+                workbook_data = apply_to_template(template_file.getvalue(), record, metrics)
+            except Exception as exc:
+                st.error(f"Could not fill the uploaded Excel template ({type(exc).__name__}: {exc}).")
+                return
             filename = f"executive_file_{mls_number}_{state}_template.xlsx"
         else:
-            result = render_default_workbook(record, metrics)
+            workbook_data = partial(render_default_workbook, record, metrics)
             filename = f"executive_file_{mls_number}_{state}.xlsx"
 
         st.download_button(
             "Download Executive Excel",
-            data=result,
+            data=workbook_data,
             file_name=filename,
             mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
             on_click="ignore",
@@ -0,0 +1,60 @@
+"""Tests for JSON-LD extraction from listing pages."""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import main  # noqa: E402
+
+LISTING_JSON_LD = r"""{
+  "@type": "SingleFamilyResidence",
+  "name": "12 Oak St",
+  "description": "Sunny colonial \ud83d",
+  "address": {"addressLocality": "Hartford", "postalCode": "06101"},
+  "numberOfBedrooms": 4,
+  "offers": {"price": 525000}
+}"""
+
+
+class ExtractJsonLdTest(unittest.TestCase):
+    def test_lone_surrogate_description_is_not_dropped(self) -> None:
+        html = f'<html><head><script type="application/ld+json">{LISTING_JSON_LD}</script></head></html>'
+
+        record = main._extract_from_html_content("https://example.com/listing", html, "24003521", "CT")
+
+        self.assertIsNotNone(record)
+        self.assertEqual(
+            (record.address, record.city, record.price, record.bedrooms),
+            ("12 Oak St", "Hartford", 525000.0, 4.0),
+        )
+
+    def test_nan_values_fall_back_to_stdlib_json(self) -> None:
+        html = '<script type="application/ld+json">{"@type": "House", "name": "1 Elm", "floorSize": {"value": NaN}}</script>'
+
+        docs = main._extract_json_ld(html)
+
+        self.assertEqual([doc["name"] for doc in docs], ["1 Elm"])
+
+    def test_malformed_block_is_skipped(self) -> None:
+        html = '<script type="application/ld+json">{bad json</script><script type="application/ld+json">{"name": "ok"}</script>'
+
+        self.assertEqual(main._extract_json_ld(html), [{"name": "ok"}])
+
+    def test_commented_out_block_is_ignored(self) -> None:
+        html = (
+            '<!-- <script type="application/ld+json">{"name": "old"}</script> -->'
+            '<script type="application/ld+json">{"name": "live"}</script>'
+        )
+
+        self.assertEqual(main._extract_json_ld(html), [{"name": "live"}])
+
+    def test_data_type_attribute_is_not_a_type(self) -> None:
+        html = '<script data-type="application/ld+json">{"name": "widget"}</script>'
+
+        self.assertEqual(main._extract_json_ld(html), [])
+
+
+if __name__ == "__main__":
+    unittest.main()